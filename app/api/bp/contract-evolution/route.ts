@@ -1,8 +1,12 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
+import { staticPayload } from '@/lib/static-payload'
 import { Prisma } from '@prisma/client'
 
 export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
+
   try {
     const { searchParams } = new URL(request.url)
     const amendmentIds = searchParams.get('amendmentIds')
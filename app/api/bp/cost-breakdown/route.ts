@@ -1,8 +1,11 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
-import { Prisma } from '@prisma/client'
+import { staticPayload } from '@/lib/static-payload'
 
 export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
+
   try {
     const { searchParams } = new URL(request.url)
     const disciplineIds = searchParams.get('disciplineIds')
@@ -22,36 +25,19 @@ export async function GET(request: Request) {
         }
       : { lumpSum: 0, reimbursable: 0, provisional: 0, backcharge: 0, total: 0 }
 
-    // PAMF by discipline with optional discipline filter
-    let pamfQuery
-    if (disciplineIds) {
-      const ids = disciplineIds.split(',').map(Number)
-      pamfQuery = await prisma.$queryRaw<
-        Array<{ discipline: string; claimAmount: number; pamfCount: number }>
-      >`
-        SELECT discipline,
-               SUM(claim_amount_usd) as claimAmount,
-               SUM(pamf_count) as pamfCount
-        FROM tb_t_pamf_claim
-        WHERE discipline_id IN (${Prisma.join(ids)})
-        GROUP BY discipline
-      `
-    } else {
-      pamfQuery = await prisma.$queryRaw<
-        Array<{ discipline: string; claimAmount: number; pamfCount: number }>
-      >`
-        SELECT discipline,
-               SUM(claim_amount_usd) as claimAmount,
-               SUM(pamf_count) as pamfCount
-        FROM tb_t_pamf_claim
-        GROUP BY discipline
-      `
-    }
+    // PAMF by discipline with optional discipline filter: level-0 totals
+    // (pipeline rollup), as the levels below repeat them
+    const pamfQuery = await prisma.tbRPamfGroupTotal.groupBy({
+      by: ['disciplineId', 'discipline'],
+      where: disciplineIds ? { disciplineId: { in: disciplineIds.split(',').map(Number) } } : {},
+      _sum: { totalClaims: true, totalAmountUsd: true },
+      orderBy: { disciplineId: 'asc' },
+    })
 
     const pamfByDiscipline = pamfQuery.map((row) => ({
       discipline: row.discipline,
-      claimAmount: Number(row.claimAmount),
-      pamfCount: Number(row.pamfCount),
+      claimAmount: Number(row._sum.totalAmountUsd ?? 0),
+      pamfCount: Number(row._sum.totalClaims ?? 0),
     }))
 
     return NextResponse.json({ costSplit, pamfByDiscipline })
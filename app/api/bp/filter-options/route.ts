@@ -1,7 +1,11 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
+import { staticPayload } from '@/lib/static-payload'
+
+export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
 
-export async function GET() {
   try {
     const [yearsRaw, amendments, disciplines, subcontractors] = await Promise.all([
       prisma.tbTMonthlyCost.findMany({
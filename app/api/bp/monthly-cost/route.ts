@@ -1,21 +1,25 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
+import { staticPayload } from '@/lib/static-payload'
 import { Prisma } from '@prisma/client'
 
 export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
+
   try {
     const { searchParams } = new URL(request.url)
     const year = searchParams.get('year')
     const startDate = searchParams.get('startDate')
     const endDate = searchParams.get('endDate')
 
-    const where: Prisma.TbTMonthlyCostWhereInput = {}
+    const where: Prisma.TbRMonthlyCostWideWhereInput = {}
 
     if (year) {
       where.year = parseInt(year)
     } else if (startDate || endDate) {
       // Convert date range to year/month compound conditions
-      const conditions: Prisma.TbTMonthlyCostWhereInput[] = []
+      const conditions: Prisma.TbRMonthlyCostWideWhereInput[] = []
       if (startDate) {
         const s = new Date(startDate)
         conditions.push({
@@ -39,7 +43,8 @@ export async function GET(request: Request) {
       }
     }
 
-    const monthlyCosts = await prisma.tbTMonthlyCost.findMany({
+    // One row per project and month with FGRS and LOGI side by side (pipeline rollup)
+    const monthlyCosts = await prisma.tbRMonthlyCostWide.findMany({
       where,
       orderBy: [{ year: 'asc' }, { month: 'asc' }],
     })
@@ -57,11 +62,8 @@ export async function GET(request: Request) {
         }
       }
 
-      if (cost.costType === 'FGRS_RCE') {
-        acc[key].FGRS = Number(cost.monthlyAmountMusd)
-      } else if (cost.costType === 'LOGI_RCE') {
-        acc[key].LOGI = Number(cost.monthlyAmountMusd)
-      }
+      acc[key].FGRS += Number(cost.fgrsMusd)
+      acc[key].LOGI += Number(cost.logiMusd)
 
       return acc
     }, {} as Record<string, { year: number; month: number; date: string; FGRS: number; LOGI: number }>)
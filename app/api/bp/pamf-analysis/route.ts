@@ -1,15 +1,18 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
+import { staticPayload } from '@/lib/static-payload'
 import { Prisma } from '@prisma/client'
 import { getDisciplineColor } from '@/lib/chart-colors'
 
 export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
+
   try {
     const { searchParams } = new URL(request.url)
     const disciplineIds = searchParams.get('disciplineIds')
 
     let topCategories
-    let scatterData
 
     if (disciplineIds) {
       const ids = disciplineIds.split(',').map(Number)
@@ -25,16 +28,6 @@ export async function GET(request: Request) {
         ORDER BY claimAmount DESC
         LIMIT 15
       `
-      scatterData = await prisma.$queryRaw<
-        Array<{ discipline: string; pamfCount: number; totalClaim: number }>
-      >`
-        SELECT discipline,
-               SUM(pamf_count) as pamfCount,
-               SUM(claim_amount_usd) as totalClaim
-        FROM tb_t_pamf_claim
-        WHERE discipline_id IN (${Prisma.join(ids)})
-        GROUP BY discipline
-      `
     } else {
       topCategories = await prisma.$queryRaw<
         Array<{ category: string; claimAmount: number; pamfCount: number }>
@@ -48,17 +41,16 @@ export async function GET(request: Request) {
         ORDER BY claimAmount DESC
         LIMIT 15
       `
-      scatterData = await prisma.$queryRaw<
-        Array<{ discipline: string; pamfCount: number; totalClaim: number }>
-      >`
-        SELECT discipline,
-               SUM(pamf_count) as pamfCount,
-               SUM(claim_amount_usd) as totalClaim
-        FROM tb_t_pamf_claim
-        GROUP BY discipline
-      `
     }
 
+    // Level-0 totals per discipline (pipeline rollup); the levels below repeat them
+    const scatterData = await prisma.tbRPamfGroupTotal.groupBy({
+      by: ['disciplineId', 'discipline'],
+      where: disciplineIds ? { disciplineId: { in: disciplineIds.split(',').map(Number) } } : {},
+      _sum: { totalClaims: true, totalAmountUsd: true },
+      orderBy: { disciplineId: 'asc' },
+    })
+
     return NextResponse.json({
       topCategories: topCategories.map((row) => ({
         category: row.category,
@@ -67,8 +59,8 @@ export async function GET(request: Request) {
       })),
       scatterData: scatterData.map((row) => ({
         discipline: row.discipline,
-        pamfCount: Number(row.pamfCount),
-        totalClaim: Number(row.totalClaim),
+        pamfCount: Number(row._sum.totalClaims ?? 0),
+        totalClaim: Number(row._sum.totalAmountUsd ?? 0),
         color: getDisciplineColor(row.discipline),
       })),
     })
@@ -1,7 +1,11 @@
 import { NextResponse } from 'next/server'
 import { prisma } from '@/lib/prisma'
+import { staticPayload } from '@/lib/static-payload'
+
+export async function GET(request: Request) {
+  const cached = await staticPayload(request)
+  if (cached) return cached
 
-export async function GET() {
   try {
     // Get latest amendment (AMD-5)
     const latestAmendment = await prisma.tbMAmendment.findFirst({
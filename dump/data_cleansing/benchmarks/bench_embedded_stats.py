@@ -0,0 +1,96 @@
+"""Benchmark the section 4.7 statistics: pandas on all_tables vs SQL on tep.sqlite.
+
+Runs the pipeline once for all_tables and the notebook helpers, then for every
+table replicated --scale times builds the embedded SQLite database (timed
+separately, it is a one-off per pipeline run) and times statistical_summary
+(pandas) against statistical_summary_sql on a fresh connection, plus one ad-hoc
+dashboard query (PAMF by discipline) both ways. The two summaries are checked
+to agree.
+
+Usage:
+    python benchmarks/bench_embedded_stats.py -i ../real_data --scale 1,10,100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tep_pipeline import run_pipeline  # noqa: E402
+
+PAMF_BY_DISCIPLINE = """SELECT discipline, SUM(pamf_count) AS claims, SUM(claim_amount_usd) AS amount_usd
+FROM tb_t_pamf_claim GROUP BY discipline ORDER BY discipline"""
+
+
+def _best(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(input_dir, scales, repeat=5):
+    with tempfile.TemporaryDirectory() as work:
+        ns = run_pipeline(input_dir, work, stages=['stats', 'embedded'], memo=False,
+                          params={'USE_EXTRACTION_CACHE': False})
+        base_tables = ns['all_tables']
+        results = []
+        for scale in scales:
+            tables = {t: pd.concat([df] * scale, ignore_index=True) for t, df in base_tables.items()}
+            # Unique primary keys, as the database requires
+            for df in tables.values():
+                df.iloc[:, 0] = range(1, len(df) + 1)
+            path = os.path.join(work, f'tep_{scale}.sqlite')
+            t0 = time.perf_counter()
+            ns['load_tables'](tables, 'sqlite:///' + path, workers=1)
+            build = time.perf_counter() - t0
+
+            def sql_stats():
+                with closing(ns['sqlite_connect'](path)) as conn:
+                    return ns['statistical_summary_sql'](conn)
+
+            def sql_pamf():
+                with closing(ns['sqlite_connect'](path)) as conn:
+                    return pd.read_sql_query(PAMF_BY_DISCIPLINE, conn)
+
+            def pandas_pamf():
+                return tables['tb_t_pamf_claim'].groupby('discipline').agg(
+                    claims=('pamf_count', 'sum'), amount_usd=('claim_amount_usd', 'sum'))
+
+            mismatched = ns['summaries_match'](ns['statistical_summary'](tables), sql_stats())
+            results.append({
+                'scale': scale, 'rows': sum(len(df) for df in tables.values()), 'build': build,
+                'stats_pandas': _best(lambda: ns['statistical_summary'](tables), repeat),
+                'stats_sql': _best(sql_stats, repeat),
+                'pamf_pandas': _best(pandas_pamf, repeat), 'pamf_sql': _best(sql_pamf, repeat),
+                'match': not mismatched,
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-i', '--input-dir', required=True, help='directory holding the three TEP workbooks')
+    parser.add_argument('--scale', default='1,10,100', help='comma-separated table replication factors')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is reported)')
+    args = parser.parse_args(argv)
+
+    results = bench(args.input_dir, [int(s) for s in args.scale.split(',')], args.repeat)
+    print(f"{'scale':>6} {'rows':>9} {'build s':>8} {'4.7 pandas ms':>14} {'4.7 SQL ms':>11} "
+          f"{'PAMF pandas ms':>15} {'PAMF SQL ms':>12} {'match':>6}")
+    for r in results:
+        print(f"{r['scale']:>6} {r['rows']:>9,} {r['build']:>8.2f} {r['stats_pandas'] * 1000:>14.1f} "
+              f"{r['stats_sql'] * 1000:>11.1f} {r['pamf_pandas'] * 1000:>15.2f} {r['pamf_sql'] * 1000:>12.2f} "
+              f"{'yes' if r['match'] else 'NO':>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
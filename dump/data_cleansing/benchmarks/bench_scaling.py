@@ -0,0 +1,185 @@
+"""Benchmark the pipeline stage by stage on synthetic workbooks of growing size.
+
+For every --scale, writes the three workbooks with synthetic_workbooks.py (or
+reuses them from --workbooks-dir), then runs the pipeline with the SQL script
+and the charts in a fresh interpreter and records:
+
+    load       streaming the three sheets into row grids (part of extract)
+    extract    the extract stages, load included
+    normalize, cleanse, sql, viz (the six charts)
+    total      wall time of run_pipeline
+    peak MB    peak resident memory of that interpreter
+
+Each run appends one record, keyed by `git describe --always --dirty`, to
+benchmarks/results/scaling.jsonl, so the results of successive versions sit
+side by side. Every measurement is compared with the latest earlier record of
+the same host and Python; one that grew by more than --tolerance (and by more
+than the noise floor) is marked, and the exit code is 1.
+
+Usage:
+    python benchmarks/bench_scaling.py --scale 1,10,100
+    python benchmarks/bench_scaling.py --scale 1000 --workbooks-dir /tmp/tep_synthetic --repeat 1
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from stage_report import peak_rss  # noqa: E402
+from synthetic_workbooks import CBS_WORKBOOK, EVOLUTION_WORKBOOK, TIMELINE_WORKBOOK, write_workbooks  # noqa: E402
+
+RESULTS = os.path.join(HERE, 'results', 'scaling.jsonl')
+STAGES = ['sql', 'viz']
+TIMED = ('load', 'extract', 'normalize', 'cleanse', 'sql', 'viz', 'total')
+# Differences below these are noise, whatever the percentage
+NOISE_FLOOR = {'seconds': 0.05, 'peak_mb': 10.0}
+
+
+def measure(input_dir, stages):
+    """One pipeline run in this process: {stage group: seconds, 'peak_mb', row counts}."""
+    from tep_pipeline import run_pipeline
+
+    with tempfile.TemporaryDirectory() as out:
+        t0 = time.perf_counter()
+        ns = run_pipeline(input_dir, out, stages=stages, memo=False, params={'USE_EXTRACTION_CACHE': False})
+        total = time.perf_counter() - t0
+    peak = peak_rss()
+    timings = ns['STAGE_TIMINGS']
+
+    t0 = time.perf_counter()
+    grid, _ = ns['stream_workbook'](ns['FILE_TIMELINE'])
+    ns['stream_workbook'](ns['FILE_EVOLUTION'])
+    ns['stream_workbook'](ns['FILE_CBS'], indent_col=1)
+    load = time.perf_counter() - t0
+
+    result = {stage: timings.get(stage, 0.0) for stage in TIMED if stage not in ('load', 'total')}
+    result.update(load=load, total=total, peak_mb=peak / 2**20 if peak else None,
+                  timeline_rows=grid.max_row, rows=sum(len(df) for df in ns['all_tables'].values()))
+    return result
+
+
+def _workbooks(scale, seed, workbooks_dir):
+    """(input dir, generation seconds or None when reused)."""
+    input_dir = os.path.join(workbooks_dir, f'scale_{scale}_seed_{seed}')
+    names = (TIMELINE_WORKBOOK, EVOLUTION_WORKBOOK, CBS_WORKBOOK)
+    if all(os.path.exists(os.path.join(input_dir, n)) for n in names):
+        return input_dir, None
+    t0 = time.perf_counter()
+    write_workbooks(input_dir, scale, seed)
+    return input_dir, time.perf_counter() - t0
+
+
+def bench(scales, stages=STAGES, repeat=3, seed=0, workbooks_dir=None):
+    with tempfile.TemporaryDirectory() as work:
+        results = []
+        for scale in scales:
+            input_dir, generate = _workbooks(scale, seed, workbooks_dir or work)
+            runs = []
+            for _ in range(repeat):
+                # A fresh interpreter per run: cold imports and a peak RSS of this run alone
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', input_dir,
+                                       '--stages', ','.join(stages)], capture_output=True, text=True, cwd=ROOT)
+                if proc.returncode != 0:
+                    raise RuntimeError(f"scale {scale} failed:\n{proc.stderr[-2000:]}")
+                runs.append(json.loads(proc.stdout.splitlines()[-1]))
+            best = {key: min(r[key] for r in runs) if runs[0][key] is not None else None
+                    for key in (*TIMED, 'peak_mb')}
+            results.append({'scale': scale, 'rows': runs[0]['rows'], 'timeline_rows': runs[0]['timeline_rows'],
+                            'generate': generate, **best})
+    return results
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_results(history, record):
+    """{scale: result} of the latest earlier record comparable with record, with its header."""
+    for old in reversed(history):
+        if (old['host'], old['python'], old['stages']) == (record['host'], record['python'], record['stages']):
+            return old, {r['scale']: r for r in old['results']}
+    return None, {}
+
+
+def regressions(result, baseline, tolerance):
+    """Measurements of result that grew by more than tolerance over baseline: {key: (old, new)}."""
+    grown = {}
+    for key in (*TIMED, 'peak_mb'):
+        old, new = baseline.get(key), result.get(key)
+        if old is None or new is None:
+            continue
+        floor = NOISE_FLOOR['peak_mb' if key == 'peak_mb' else 'seconds']
+        if new > old * (1 + tolerance) and new - old > floor:
+            grown[key] = (old, new)
+    return grown
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', default='1,10,100', help='comma-separated size multiples of the real workbooks')
+    parser.add_argument('--stages', default=','.join(STAGES), help='optional stages to run on top of the core ones')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scale (best is reported)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic values')
+    parser.add_argument('--workbooks-dir', help='keep generated workbooks here and reuse them on later runs')
+    parser.add_argument('--results', default=RESULTS, help='JSON-lines file the run is appended to')
+    parser.add_argument('--no-save', action='store_true', help='compare only, do not append this run')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative growth reported as a regression')
+    parser.add_argument('--measure', metavar='INPUT_DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    stages = [s for s in args.stages.split(',') if s]
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, stages)))
+        return 0
+
+    record = {
+        'revision': _revision(), 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(), 'platform': platform.platform(), 'python': platform.python_version(),
+        'stages': stages, 'seed': args.seed, 'repeat': args.repeat,
+        'results': bench([int(s) for s in args.scale.split(',')], stages, args.repeat, args.seed,
+                         args.workbooks_dir and os.path.abspath(args.workbooks_dir)),
+    }
+    previous, baseline = previous_results(load_history(args.results), record)
+
+    print(f"{'scale':>6} {'rows':>9} {'gen s':>6} " + ' '.join(f'{k:>9}' for k in TIMED) + f" {'peak MB':>8}")
+    regressed = False
+    for r in record['results']:
+        gen = f"{r['generate']:>6.1f}" if r['generate'] is not None else f"{'-':>6}"
+        peak = f"{r['peak_mb']:>8.0f}" if r['peak_mb'] is not None else f"{'-':>8}"
+        print(f"{r['scale']:>6} {r['rows']:>9,} {gen} " + ' '.join(f'{r[k]:>9.2f}' for k in TIMED) + f' {peak}')
+        for key, (old, new) in regressions(r, baseline.get(r['scale'], {}), args.tolerance).items():
+            regressed = True
+            print(f"{'':>6} REGRESSION {key}: {old:.2f} -> {new:.2f} (+{(new / old - 1) * 100:.0f}%)")
+    if previous:
+        print(f"compared with {previous['revision']} ({previous['date']})")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"appended to {args.results}")
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
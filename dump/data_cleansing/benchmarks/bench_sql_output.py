@@ -0,0 +1,84 @@
+"""Benchmark the two MySQL output paths: INSERT script vs bulk-load files.
+
+Runs the pipeline once for all_tables and the SQL helpers, then executes the
+mysql_script (tep_mysql_insert.sql) and mysql_bulk_load (TSV per table +
+tep_mysql_load.sql) stage cells with every table replicated --scale times.
+Only generation is timed; the import side needs a MySQL server.
+
+Usage:
+    python benchmarks/bench_sql_output.py -i ../real_data --scale 1,10,50
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_notebook import cells  # noqa: E402
+from stage_graph import build_graph  # noqa: E402
+from tep_pipeline import _run_stage, run_pipeline  # noqa: E402
+
+PATHS = {'insert': 'mysql_script', 'bulk': 'mysql_bulk_load'}
+
+
+def _output_bytes(output_dir, stage):
+    return sum(os.path.getsize(os.path.join(output_dir, f))
+               for f in os.listdir(output_dir) if any(fnmatch.fnmatch(f, p) for p in stage.files))
+
+
+def bench(input_dir, scales, repeat=3):
+    stages = {s.name: s for s in build_graph(cells) if s.name in PATHS.values()}
+    with tempfile.TemporaryDirectory() as work:
+        ns = run_pipeline(input_dir, work, stages=['sql', 'bulk'], memo=False,
+                          params={'USE_EXTRACTION_CACHE': False})
+        base_tables = ns['all_tables']
+        results = []
+        for scale in scales:
+            tables = {t: pd.concat([df] * scale, ignore_index=True) for t, df in base_tables.items()}
+            rows = sum(len(df) for df in tables.values())
+            for path, stage_name in PATHS.items():
+                stage = stages[stage_name]
+                out_dir = os.path.join(work, f'{path}_{scale}')
+                os.makedirs(out_dir, exist_ok=True)
+                best = float('inf')
+                for _ in range(repeat):
+                    namespace = dict(ns, all_tables=tables, OUTPUT_DIR=out_dir)
+                    t0 = time.perf_counter()
+                    with open(os.devnull, 'w') as devnull:
+                        stdout, sys.stdout = sys.stdout, devnull
+                        try:
+                            _run_stage(stage, namespace, None, None, None)
+                        finally:
+                            sys.stdout = stdout
+                    best = min(best, time.perf_counter() - t0)
+                results.append({'scale': scale, 'rows': rows, 'path': path, 'seconds': best,
+                                'bytes': _output_bytes(out_dir, stage)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-i', '--input-dir', required=True, help='directory holding the three TEP workbooks')
+    parser.add_argument('--scale', default='1,10,50', help='comma-separated table replication factors')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+    args = parser.parse_args(argv)
+
+    results = bench(args.input_dir, [int(s) for s in args.scale.split(',')], args.repeat)
+    print(f"{'scale':>6} {'rows':>9} {'path':<7} {'seconds':>9} {'MB':>8} {'speedup':>8}")
+    insert_time = {}
+    for r in results:
+        if r['path'] == 'insert':
+            insert_time[r['scale']] = r['seconds']
+        speedup = insert_time[r['scale']] / r['seconds']
+        print(f"{r['scale']:>6} {r['rows']:>9,} {r['path']:<7} {r['seconds']:>9.3f} "
+              f"{r['bytes'] / 1e6:>8.2f} {speedup:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
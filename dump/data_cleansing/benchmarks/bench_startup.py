@@ -0,0 +1,106 @@
+"""Benchmark pipeline startup: wall time and imports of the common reruns.
+
+Prepares a scratch output directory with one full run, then times each
+scenario in a fresh interpreter under `python -X importtime` and reports the
+wall time, the time spent importing, the packages that cost the most and which
+heavy dependencies were loaded at all. A scenario that loads a dependency it
+does not need (openpyxl when the extraction cache is warm, pandas when every
+stage is memoized, matplotlib without charts) is flagged and the exit code is
+1, so the lazy imports stay lazy.
+
+Usage:
+    python benchmarks/bench_startup.py -i ../real_data
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIPELINE = os.path.join(ROOT, 'tep_pipeline.py')
+HEAVY = ('pandas', 'numpy', 'pyarrow', 'openpyxl', 'matplotlib', 'seaborn')
+
+
+def scenarios(input_dir, out_dir):
+    """[(name, argv, modules it must not import)]; '{fresh}' in argv stands for
+    a new, empty output directory per run."""
+    cached_extraction = (f"import sys; sys.path.insert(0, {ROOT!r}); from tep_pipeline import run_pipeline; "
+                         f"run_pipeline({input_dir!r}, {out_dir!r}, stages=['sql'], memo=False)")
+    cli = [sys.executable, '-X', 'importtime', PIPELINE, '-i', input_dir]
+    return [
+        ('memoized sql', cli + ['-o', out_dir, '--stages', 'sql'], HEAVY),
+        ('cached extraction sql', [sys.executable, '-X', 'importtime', '-c', cached_extraction],
+         ('openpyxl', 'matplotlib', 'seaborn')),
+        ('cold sql', cli + ['-o', '{fresh}', '--stages', 'sql', '--no-cache'], ('matplotlib', 'seaborn')),
+        ('cold full run', cli + ['-o', '{fresh}', '--no-cache'], ()),
+    ]
+
+
+def parse_importtime(stderr):
+    """({root package: microseconds}, set of imported module names) from -X importtime output."""
+    per_package, modules = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        modules.add(module)
+        if len(name) - len(name.lstrip()) == 1:  # top level; nested imports are in its cumulative
+            root = module.split('.')[0]
+            per_package[root] = per_package.get(root, 0) + int(cumulative)
+    return per_package, modules
+
+
+def run(argv, repeat, work):
+    best = None
+    for _ in range(repeat):
+        fresh = tempfile.mkdtemp(dir=work)
+        argv_run = [a.replace('{fresh}', fresh) for a in argv]
+        t0 = time.perf_counter()
+        proc = subprocess.run(argv_run, capture_output=True, text=True, cwd=ROOT)
+        elapsed = time.perf_counter() - t0
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+        if best is None or elapsed < best[0]:
+            best = (elapsed, proc.stderr)
+    return best
+
+
+def bench(input_dir, repeat=3):
+    with tempfile.TemporaryDirectory() as work:
+        out_dir = os.path.join(work, 'out')
+        subprocess.run([sys.executable, PIPELINE, '-i', input_dir, '-o', out_dir],
+                       check=True, capture_output=True, cwd=ROOT)
+        results = []
+        for name, argv, forbidden in scenarios(input_dir, out_dir):
+            wall, stderr = run(argv, repeat, work)
+            per_package, modules = parse_importtime(stderr)
+            loaded = [m for m in HEAVY if any(x == m or x.startswith(m + '.') for x in modules)]
+            results.append({
+                'scenario': name, 'wall': wall, 'imports': sum(per_package.values()) / 1e6,
+                'top': sorted(per_package.items(), key=lambda kv: -kv[1])[:5],
+                'loaded': loaded, 'unexpected': [m for m in loaded if m in forbidden],
+            })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-i', '--input-dir', required=True, help='directory holding the three TEP workbooks')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario (best is reported)')
+    args = parser.parse_args(argv)
+
+    results = bench(os.path.abspath(args.input_dir), args.repeat)
+    print(f"{'scenario':<22} {'wall s':>7} {'imports s':>10}  loaded")
+    for r in results:
+        print(f"{r['scenario']:<22} {r['wall']:>7.2f} {r['imports']:>10.2f}  {', '.join(r['loaded']) or '-'}")
+        print(f"{'':<22} top: " + ', '.join(f"{p} {us / 1000:.0f} ms" for p, us in r['top']))
+        if r['unexpected']:
+            print(f"{'':<22} UNEXPECTED: {', '.join(r['unexpected'])}")
+    return 1 if any(r['unexpected'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
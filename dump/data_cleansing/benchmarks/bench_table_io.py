@@ -0,0 +1,84 @@
+"""Benchmark reading all_tables back: cleaned CSVs vs Arrow IPC vs Parquet.
+
+Runs the pipeline once for all_tables and the columnar codec, writes every
+table replicated --scale times as CSV and through write_columnar, then times
+loading the whole set: pd.read_csv per table (text parsing, inferred dtypes)
+against load_columnar_tables on memory-mapped Arrow files and on Parquet
+(original dtypes).
+
+Usage:
+    python benchmarks/bench_table_io.py -i ../real_data --scale 1,10,100
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tep_pipeline import run_pipeline  # noqa: E402
+
+FILES = {'csv': '.csv', 'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+def _best(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(input_dir, scales, repeat=5):
+    with tempfile.TemporaryDirectory() as work:
+        ns = run_pipeline(input_dir, work, stages=['columnar'], memo=False,
+                          params={'USE_EXTRACTION_CACHE': False})
+        base_tables = ns['all_tables']
+        results = []
+        for scale in scales:
+            tables = {t: pd.concat([df] * scale, ignore_index=True) for t, df in base_tables.items()}
+            rows = sum(len(df) for df in tables.values())
+            readers = {}
+            for fmt in ('arrow', 'parquet'):
+                out_dir = os.path.join(work, f'{fmt}_{scale}')
+                os.makedirs(out_dir, exist_ok=True)
+                for t, df in tables.items():
+                    ns['write_columnar'](df, os.path.join(out_dir, t), (fmt,))
+                with open(os.path.join(out_dir, 'tb_tables.json'), 'w', encoding='utf-8') as f:
+                    json.dump({'tables': list(tables), 'formats': [fmt]}, f)
+                readers[fmt] = (out_dir, lambda d=out_dir: ns['load_columnar_tables'](d))
+            csv_dir = os.path.join(work, f'csv_{scale}')
+            os.makedirs(csv_dir, exist_ok=True)
+            for t, df in tables.items():
+                df.to_csv(os.path.join(csv_dir, f'{t}.csv'), index=False)
+            readers['csv'] = (csv_dir, lambda: {t: pd.read_csv(os.path.join(csv_dir, f'{t}.csv')) for t in tables})
+            for fmt, (out_dir, read) in readers.items():
+                size = sum(os.path.getsize(os.path.join(out_dir, t + FILES[fmt])) for t in tables)
+                results.append({'scale': scale, 'rows': rows, 'format': fmt,
+                                'seconds': _best(read, repeat), 'bytes': size})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-i', '--input-dir', required=True, help='directory holding the three TEP workbooks')
+    parser.add_argument('--scale', default='1,10,100', help='comma-separated table replication factors')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is reported)')
+    args = parser.parse_args(argv)
+
+    results = bench(args.input_dir, [int(s) for s in args.scale.split(',')], args.repeat)
+    csv_time = {r['scale']: r['seconds'] for r in results if r['format'] == 'csv'}
+    print(f"{'scale':>6} {'rows':>9} {'format':<8} {'seconds':>9} {'MB':>8} {'speedup':>8}")
+    for r in results:
+        print(f"{r['scale']:>6} {r['rows']:>9,} {r['format']:<8} {r['seconds']:>9.4f} "
+              f"{r['bytes'] / 1e6:>8.2f} {csv_time[r['scale']] / r['seconds']:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
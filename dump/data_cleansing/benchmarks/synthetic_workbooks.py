@@ -0,0 +1,392 @@
+"""Generate synthetic TEP workbooks at a multiple of the real data's size.
+
+Writes the three workbooks the pipeline reads, under their real file names,
+with the layout quirks the extraction code depends on:
+
+* Timeline: year headers merged over rows 1-2, months on row 3 with 2017/2018
+  aggregated as merged '1 - 12' cells and 2024 in merged quarters, phase
+  labels on row 4, text-only blocks (contract value transformation, AMD
+  estimate rows, key highlights, contract notes), the FGRS/LOGI/POB/isolation
+  rows and one section per subcontractor in the three real layouts (Meindo:
+  8 metric rows, Penta: 8 rows and a notes block, Daewoo: a multi-line name,
+  'Plan POB'/'Actual POB' and a notes block). Progress is stored as fractions.
+* Contract Evolution: 'Total CONTRACT PRICE' merged over B2:C2, the six amount
+  columns, sections A-D with numbered items and decimal sub-items (3.1),
+  approved-VO lines, an unnumbered subtotal and the closing 'Revised CONTRACT
+  PRICE' row. Subtotals are written as values, as openpyxl cannot store the
+  cached result of a formula.
+* Cost Breakdown Structure: the 'List PAMF' pivot with its hierarchy in the
+  column A indent (discipline / category / item), duplicate item labels,
+  zero and empty amounts, and a 'Grand Total' row.
+
+--scale multiplies the row count of each workbook: 3 x scale subcontractor
+sections (the first three are Meindo, Penta and Daewoo), scale x the
+evolution line items and scale x the PAMF categories. The time axis keeps the
+real June 2016 - 2024 span. Values come from a seeded generator, so a given
+(scale, seed) always produces the same workbooks. Sheets are streamed in
+openpyxl's write-only mode, so memory stays flat up to 1000x.
+
+Usage:
+    python benchmarks/synthetic_workbooks.py -o ./synthetic --scale 10
+"""
+import argparse
+import os
+import random
+import sys
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+TIMELINE_WORKBOOK = 'Contract Value Overview and Timeline_15-Jul-24.xlsx'
+EVOLUTION_WORKBOOK = 'TEP Contract Evolution.xlsx'
+CBS_WORKBOOK = 'Cost Breakdown Structure.xlsx'
+
+# ---------------------------------------------------------------- timeline
+
+FIRST_DATA_COL = 4
+NOTES_COLS = 5   # remark columns right of the time axis
+REAL_SUBCONTRACTORS = ('Meindo', 'Penta', 'Daewoo')
+SECTION_METRICS = ('Achieved Mhrs', 'Invoice Value (MUSD)', 'Actual/VOWD', 'POB',
+                   'Plan Cumm.Prog', 'Actual Cumm. Prog', 'Plan per Month', 'Actual per Month')
+DAEWOO_METRICS = SECTION_METRICS[:3] + ('Plan POB', 'Actual POB') + SECTION_METRICS[4:]
+# Rows per section layout: header + metric rows + remarks/notes block
+SECTION_STRIDE = (14, 49, 67)
+PERCENT = '0.0%'
+
+
+def time_axis():
+    """[(year, first col, [(col, month or aggregate label)])] of the real header layout."""
+    axis, col = [], FIRST_DATA_COL
+    layout = [(2016, list(range(6, 13)))]
+    layout += [(year, ['1 - 12']) for year in (2017, 2018)]
+    layout += [(year, list(range(1, 13))) for year in range(2019, 2024)]
+    layout += [(2024, ['1 - 3', '4 - 6', '7 - 9', '10-12'])]
+    for year, months in layout:
+        first, cols = col, []
+        for month in months:
+            cols.append((col, month))
+            # Aggregates span several columns: 3 for a year, 2 for a quarter
+            col += 1 if isinstance(month, int) else (3 if month == '1 - 12' else 2)
+        axis.append((year, first, cols))
+    return axis
+
+
+class _RowWriter:
+    """Append sparse {col: value} rows to a write-only sheet, padding skipped rows."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.row = 0
+
+    def write(self, row, cells):
+        while self.row < row - 1:
+            self.ws.append([])
+            self.row += 1
+        width = max(cells, default=0)
+        values = [None] * width
+        for col, value in cells.items():
+            values[col - 1] = value
+        self.ws.append(values)
+        self.row += 1
+
+
+def _styled(ws, value, number_format=None, indent=None):
+    cell = WriteOnlyCell(ws, value=value)
+    if number_format:
+        cell.number_format = number_format
+    if indent:
+        cell.alignment = Alignment(indent=indent)
+    return cell
+
+
+def _walk(rng, n, start, step, lo=0.0):
+    values, v = [], start
+    for _ in range(n):
+        v = max(lo, v + rng.uniform(-step, step))
+        values.append(v)
+    return values
+
+
+def _progress(rng, n):
+    """Plan and actual cumulative progress (fractions, S-curve-ish) over n months."""
+    plan, actual, p, a = [], [], 0.0, 0.0
+    for i in range(n):
+        p = min(1.0, p + rng.uniform(0.5, 1.5) * 2.0 / n * (1 - abs(2 * i / n - 1)))
+        a = min(p, a + rng.uniform(0.3, 1.2) * 2.0 / n * (1 - abs(2 * i / n - 1)))
+        plan.append(p)
+        actual.append(a)
+    return plan, actual
+
+
+def _section_rows(rng, ws, index, name, first_row, data_cols):
+    """{row: {col: value}} of one subcontractor section starting at first_row."""
+    kind = index % 3
+    metrics = DAEWOO_METRICS if kind == 2 else SECTION_METRICS
+    label = name
+    if kind == 2:
+        label = f"{name}\n(Contract No.\n{1306754 + index}\n{1306984 + index})"
+    notes_col = data_cols[-1] + 1
+    rows = {first_row: {2: label, 3: 'Subcontract Duration and Value'}}
+    if kind == 1:
+        rows[first_row][notes_col + 1] = "- Total VOWD (up to Sep'23)"
+
+    start = rng.randint(10, 24)   # from 2019: 2016 months and the 2017/2018 aggregates come first
+    span = data_cols[start:start + rng.randint(40, 54)]
+    n = len(span)
+    plan, actual = _progress(rng, n)
+    series = {
+        'Achieved Mhrs': (3, _walk(rng, n, 15.0, 6.0)),
+        'Invoice Value (MUSD)': (min(17, n - 1), _walk(rng, n, 3.0, 1.5)),
+        'Actual/VOWD': (min(17, n - 1), _walk(rng, n, 5.0, 2.0)),
+        'POB': (4, [round(v) for v in _walk(rng, n, 800, 150, lo=50)]),
+        'Plan POB': (n - 4, [round(v) for v in _walk(rng, n, 900, 100, lo=50)]),
+        'Actual POB': (2, [round(v) for v in _walk(rng, n, 700, 150, lo=50)]),
+        'Plan Cumm.Prog': (0, plan),
+        'Actual Cumm. Prog': (0, actual),
+        'Plan per Month': (0, [b - a for a, b in zip([0.0] + plan, plan)]),
+        'Actual per Month': (0, [b - a for a, b in zip([0.0] + actual, actual)]),
+    }
+    for offset, metric in enumerate(metrics, start=1):
+        skip, values = series[metric]
+        fmt = PERCENT if 'Prog' in metric or 'per Month' in metric else None
+        cells = {3: metric}
+        for col, value in zip(span[skip:], values[skip:]):
+            cells[col] = _styled(ws, value, fmt) if fmt else value
+        if metric == 'Actual/VOWD':
+            cells[notes_col] = "up to Sep'23"
+        rows[first_row + offset] = cells
+
+    remarks = first_row + len(metrics) + 2
+    rows[remarks] = {span[0]: f'{name} not performing as planned',
+                     span[len(span) // 2]: '- Preservation works\n- Piping erection'}
+    if kind:
+        # Contract notes: unlabelled text with the odd stray number (payment totals)
+        for r in range(remarks + 4, first_row + SECTION_STRIDE[kind] - 3, 3):
+            rows[r] = {rng.choice(data_cols): f'{r - remarks}) Reflect actual spend + forecast'}
+        rows[first_row + SECTION_STRIDE[kind] - 4] = {
+            notes_col - 4: "TOTAL payment from 1 Sep'20:", notes_col - 1: round(rng.uniform(1e3, 9e4), 2)}
+    return rows
+
+
+def write_timeline(path, scale=1, seed=0):
+    rng = random.Random(f'timeline-{seed}')
+    axis = time_axis()
+    data_cols = [col for _, _, cols in axis for col, month in cols]
+    col_index = {col: i for i, col in enumerate(data_cols)}
+    last_col = data_cols[-1] + 1 + NOTES_COLS
+
+    def between(first, last):
+        return data_cols[col_index[first]:col_index[last] + 1]
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Overall (with%prog)')
+    ws.column_dimensions['A'].width = 1.86
+    ws.column_dimensions['C'].width = 16.43
+    out = _RowWriter(ws)
+
+    # Header: merged years (rows 1-2), months/aggregates (row 3), phases (row 4)
+    years, months = {}, {}
+    ends = [first - 1 for _, first, _ in axis[1:]] + [data_cols[-1] + 1]
+    for (year, first, cols), end in zip(axis, ends):
+        years[first] = year
+        ws.merged_cells.add(f'{get_column_letter(first)}1:{get_column_letter(end)}2')
+        for col, month in cols:
+            months[col] = month
+            if not isinstance(month, int):
+                width = 3 if month == '1 - 12' else 2
+                ws.merged_cells.add(f'{get_column_letter(col)}3:{get_column_letter(col + width - 1)}3')
+    out.write(1, years)
+    out.write(3, months)
+    out.write(4, {4: 'Before COVID-19', 31: 'COVID-19 Pandemic', 40: 'Force Majeure (FM)'})
+    out.write(5, {3: 'EPCI Contract\nKey Dates'})
+
+    # Contract value transformation: labels and MUSD text in the data columns
+    out.write(15, {2: 'CONTRACT VALUE \nTRANSFORMATION', 3: 'ORIGINAL', 7: 'LUMP SUM 2,396 MUSD'})
+    out.write(16, {7: 'PROV SUM 36 MUSD'})
+    row = 18
+    for amd, fgrs in (('AMD-2', 188), ('AMD-3', 421), ('AMD-4', 854), ('AMD-5', 1510), ('Post \nAMD-5', 1830)):
+        out.write(row, {3: amd, 7: 'LUMP SUM (incl.LOGI)', 21: 'LUMP SUM (excl.LOGI); TOTAL',
+                        37: f'FGRS RCE {fgrs:,} MUSD'})
+        out.write(row + 1, {21: f'LOGI RCE {250 + row} MUSD'})
+        out.write(row + 2, {7: f'PROV SUM {36 + 10 * row} MUSD (incl. COVID-19)'})
+        row += 5 if amd != 'AMD-2' else 4
+
+    # Key series: FGRS monthly, LOGI cumulative, POB, isolation
+    fgrs = between(37, data_cols[-8])
+    out.write(43, {2: 'FGRS RCE ACTUAL COST (MUSD)', 3: 'Monthly FGRS',
+                   **dict(zip(fgrs, _walk(rng, len(fgrs), 30.0, 12.0, lo=1.0)))})
+    for i, amd in enumerate(('AMD-3 Est.Period', 'AMD-4 Est.Period', 'AMD-5 Est.Period', 'Post AMD-5')):
+        out.write(44 + i, {3: amd, 37: f'FGRS RCE {675 + 300 * i:,} MUSD'})
+    logi = between(21, data_cols[-8])
+    cumulative, total = [], 0.0
+    for _ in logi:
+        total += rng.uniform(2.0, 25.0)
+        cumulative.append(total)
+    out.write(49, {2: 'LOGI RCE ACTUAL COST (MUSD)', 3: 'Monhtly LOGI', **dict(zip(logi, cumulative))})
+    for i, amd in enumerate(('AMD-3 Est.Period', 'AMD-4 Est.Period', 'AMD-5 Est.Period', 'Post AMD-5')):
+        out.write(50 + i, {3: amd, 21: f'LOGI RCE {351 + 35 * i} MUSD'})
+    pob = between(24, data_cols[-9])
+    out.write(55, {2: 'POB (CSTS+SubCon)',
+                   **dict(zip(pob, [round(v) for v in _walk(rng, len(pob), 9000, 900, lo=500)]))})
+    iso = between(43, 52)
+    out.write(58, {2: 'Workers at Site Isolation Facility',
+                   **dict(zip(iso, [round(v) for v in _walk(rng, len(iso), 200, 120)]))})
+    out.write(60, {2: 'KEY HIGHLIGHTS', 31: '- Indonesia declared COVID-19 pandemic',
+                   40: '- 1st Outbreak at Site (April 2020)'})
+    out.write(62, {2: 'PIPING ERECTION CASE:'})
+
+    # Subcontractor sections
+    row = 63
+    for i in range(3 * scale):
+        name = REAL_SUBCONTRACTORS[i] if i < len(REAL_SUBCONTRACTORS) else f'Subcontractor {i + 1:04d}'
+        for r, cells in sorted(_section_rows(rng, ws, i, name, row, data_cols).items()):
+            out.write(r, cells)
+        row += SECTION_STRIDE[i % 3]
+    out.write(row, {last_col - 4: 'in thousand USD'})
+    wb.save(path)
+
+
+# ---------------------------------------------------------------- evolution
+
+AMENDMENTS = ('Original Contract', 'Amendment 1', 'Amendment 2', 'Amendment 3', 'Amendment 4', 'Amendment 5')
+EVOLUTION_SECTIONS = (
+    ('A', 'EPC LUMP SUM', ('PROJECT MANAGEMENT', 'ENGINEERING', 'PROCUREMENT', 'CONSTRUCTION', 'LOGISTICS',
+                           'COMMISSIONING', 'SPENT MILESTONES PAYMENT', 'REMAINING MILESTONES PAYMENT',
+                           'NOVATED CONTRACTS', 'APPROVED VOs (VO No. {vo})',
+                           'Existing VORs agreed as part of AMENDMENT {amd}'), 0, 1.0),
+    ('B', 'REIMBURSABLE CHARGES', ('PROJECT MANAGEMENT', 'ENGINEERING', 'PROCUREMENT', 'CONSTRUCTION',
+                                   'COMMISSIONING', 'List of VARIATIONS', 'LOGISTICS'), 2, 1.0),
+    ('C', 'PROVISIONAL SUM', ('Provisional Sums', 'Additional COVID-19 costs', 'Change in Labor Law (PP35)'), 0, 1.0),
+    ('D', 'BACKCHARGE', ('Backcharge for Fuel Onshore Equipment',), 3, -1.0),
+)
+SUB_ITEMS = ('Permanent LNG Train & Facilities', 'Site Temp. Facilities, mob demob',
+             'Facilities and services for COMPANY', 'Direct COVID-19 Costs', 'Other Related COVID-19 Costs')
+
+
+def _amounts(rng, first_amendment, sign):
+    """Six amendment amounts; None before the item first appears."""
+    base = rng.uniform(1e6, 3e8)
+    values = []
+    for i in range(len(AMENDMENTS)):
+        if i < first_amendment:
+            values.append(None)
+        else:
+            base *= rng.uniform(0.8, 1.4) if rng.random() < 0.6 else 1.0
+            values.append(sign * round(base))
+    return values
+
+
+def _total(rows):
+    return [sum(v[i] or 0 for v in rows) if any(v[i] is not None for v in rows) else None
+            for i in range(len(AMENDMENTS))]
+
+
+def write_evolution(path, scale=1, seed=0):
+    rng = random.Random(f'evolution-{seed}')
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Contract (2)')
+    ws.merged_cells.add('B2:C2')
+    ws.append([])
+    ws.append([None, 'Total CONTRACT PRICE', None, 'Amount in USD'])
+    ws.append([None, 'No', 'DESCRIPTION', *AMENDMENTS])
+
+    section_totals, vo = [], 1
+    for code, title, items, first_amendment, sign in EVOLUTION_SECTIONS:
+        lines, item_totals = [], []
+        for n in range(1, len(items) * scale + 1):
+            desc = items[(n - 1) % len(items)].format(vo=vo, amd=rng.randint(2, 5))
+            if 'VO No.' in desc:
+                vo += 1
+            start = max(first_amendment, rng.choice((0, 0, 0, 1, 2, 3)) if sign > 0 else first_amendment)
+            subs = [(f'{n}.{k}', SUB_ITEMS[(n + k) % len(SUB_ITEMS)], _amounts(rng, max(start, 2), sign))
+                    for k in range(1, rng.choice((1, 1, 1, 3, 4)))]
+            values = _total([v for _, _, v in subs]) if subs else _amounts(rng, start, sign)
+            if subs and start < 2:
+                # Parent carries the full amount before its split into sub-items
+                values[:2] = _amounts(rng, start, sign)[:2]
+            item_totals.append(values)
+            lines.append((n, desc, values))
+            lines += [(float(no), d, v) for no, d, v in subs]
+            if code == 'B' and n == len(items) - 1:
+                lines.append((None, 'Subtotal Target Reimbursable Post FGRS Costs', _total(item_totals)))
+        totals = _total(item_totals)
+        section_totals.append(totals)
+        ws.append([None, code, title, *totals])
+        for no, desc, values in lines:
+            ws.append([None, no, desc, *values])
+    ws.append([None, None, 'Revised CONTRACT PRICE', *_total(section_totals)])
+    wb.save(path)
+
+
+# ---------------------------------------------------------------- CBS (PAMF)
+
+DISCIPLINES = ('covid', 'logistic', 'PMT', 'SMT')
+PAMF_CATEGORIES = ('PROJECT MANAGEMENT', 'ENGINEERING', 'PROCUREMENT', 'CONSTRUCTION PERMANENT',
+                   'TEMPORARY WORKS', 'COMMISSIONING', 'BP ADDITIONAL REQUEST', 'COVID-19 IMPACT', 'LOGISTIC')
+PAMF_ITEMS = ('CIVIL WORKS', 'PILING WORKS', 'BOFF & LNG JETTY', 'Piping', 'ELECTRICAL', 'INSTRUMENT & TELECOM',
+              'STEEL STRUCTURE ERECTION', 'MECHANICAL WORKS', 'PIPING ERECTION', 'PAINTING', 'INSULATION',
+              'DIRECT HIRING', 'ICT Costs', 'Travel Expenses', 'Office Costs JV', 'HSSE', 'SCAFFOLDING WORK',
+              'EQUIPMENT SUPPLY/RENTAL', 'OTHER COST', 'OTHER (INSPECTION, PERMIT, ETC.)', 'SALES TO CPY',
+              'PMT Man-hours', 'SMT Man-hours - ENGINEERING', 'TRANSPORTATION IN INDONESIA')
+CATEGORIES_PER_DISCIPLINE = (1, 2, 5, 9)   # covid, logistic, PMT, SMT at 1x: 17 categories
+
+
+def write_cbs(path, scale=1, seed=0):
+    rng = random.Random(f'cbs-{seed}')
+    pivot = []   # (indent, label, count, amount)
+    for discipline, n_categories in zip(DISCIPLINES, CATEGORIES_PER_DISCIPLINE):
+        d_rows = []
+        for c in range(n_categories * scale):
+            category = PAMF_CATEGORIES[c % len(PAMF_CATEGORIES)]
+            c_rows = []
+            for item in rng.sample(PAMF_ITEMS, rng.randint(1, 8)):
+                count = max(1, int(rng.paretovariate(1.2)) * rng.randint(1, 12))
+                draw = rng.random()
+                amount = None if draw < 0.01 else 0 if draw < 0.03 else count * rng.lognormvariate(12, 1.5)
+                c_rows.append((2, f'{rng.randint(1, 18):02d} {item}', count, amount))
+            d_rows.append((1, f'{c % 10 + 1:02d} {category}', sum(r[2] for r in c_rows),
+                           sum(r[3] or 0 for r in c_rows)))
+            d_rows += c_rows
+        level1 = [r for r in d_rows if r[0] == 1]
+        pivot.append((0, discipline, sum(r[2] for r in level1), sum(r[3] for r in level1)))
+        pivot += d_rows
+    level0 = [r for r in pivot if r[0] == 0]
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('List PAMF')
+    ws.append([])
+    ws.append([])
+    ws.append(['Row Labels', 'Sum of [DistinctCountPAMF_No]', 'Sum of [SumPAMF_Claim_Amount]'])
+    for indent, label, count, amount in pivot:
+        ws.append([_styled(ws, label, indent=indent), count, _styled(ws, amount, '#,##0')])
+    ws.append(['Grand Total', sum(r[2] for r in level0), sum(r[3] for r in level0)])
+    wb.save(path)
+
+
+def write_workbooks(output_dir, scale=1, seed=0):
+    """Write the three workbooks into output_dir; returns {workbook: path}."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name, writer in ((TIMELINE_WORKBOOK, write_timeline), (EVOLUTION_WORKBOOK, write_evolution),
+                         (CBS_WORKBOOK, write_cbs)):
+        paths[name] = os.path.join(output_dir, name)
+        writer(paths[name], scale, seed)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-o', '--output-dir', required=True, help='directory to write the three workbooks to')
+    parser.add_argument('--scale', type=int, default=1, help='row multiple of the real workbooks (1 = real size)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the values')
+    args = parser.parse_args(argv)
+
+    for name, path in write_workbooks(args.output_dir, args.scale, args.seed).items():
+        print(f"{os.path.getsize(path) / 1e6:>8.2f} MB  {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
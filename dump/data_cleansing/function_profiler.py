@@ -0,0 +1,240 @@
+"""Opt-in profiling of selected pipeline functions.
+
+FunctionProfiler replaces functions defined by the notebook cells with
+wrappers that count calls and time them. While any wrapped function runs it
+also collects:
+
+    cprofile  a cProfile of everything the call does (pstats + text listing)
+    lines     per-line hit counts and time of the wrapped functions themselves
+    samples   stack samples of the main thread every few ms, in the collapsed
+              format flamegraph.pl and speedscope read
+
+Outside the wrapped calls nothing is traced, so the rest of the run keeps its
+speed. Line tracing inflates the times of the code it traces; leave it out
+(modes) for cumulative times you can compare with unprofiled runs. Generator
+functions (generate_inserts) are timed across all their resumes.
+
+Enabled with `tep_pipeline.py --profile [names]` or the TEP_PROFILE environment
+variable (a comma-separated list of names, or 1 for DEFAULT_TARGETS);
+TEP_PROFILE_MODES picks the modes. The results go to <output-dir>/profile/.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+DEFAULT_TARGETS = ('build_column_date_map', 'find_best_data_row', 'classify_metric',
+                   'extract_subcontractor_data', 'get_mysql_type', 'generate_inserts')
+MODES = ('cprofile', 'lines', 'samples')
+PROFILE_DIR = 'profile'
+
+
+def profile_from_env(environ=os.environ):
+    """(targets, modes) requested by TEP_PROFILE / TEP_PROFILE_MODES, or (None, None)."""
+    value = environ.get('TEP_PROFILE', '').strip()
+    if value in ('', '0'):
+        return None, None
+    targets = DEFAULT_TARGETS if value == '1' else tuple(n.strip() for n in value.split(',') if n.strip())
+    modes = tuple(m.strip() for m in environ.get('TEP_PROFILE_MODES', ','.join(MODES)).split(',') if m.strip())
+    return targets, modes
+
+
+class FunctionProfiler:
+    """Wraps target functions in a namespace and collects their profiles."""
+
+    def __init__(self, targets=DEFAULT_TARGETS, modes=MODES, interval=0.005):
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown profile modes {sorted(unknown)}; choose from {MODES}")
+        self.targets = tuple(targets)
+        self.modes = tuple(modes)
+        self.interval = interval
+        self.calls = {}     # name -> {'calls', 'total_s', 'max_s'}
+        self.lines = {}     # (name, line) -> [hits, seconds]
+        self.stacks = {}    # collapsed stack -> samples
+        self.sources = {}   # code filename -> source text
+        self._codes = {}    # code object -> target name
+        self._depth = 0
+        self._line_state = {}
+        self._cprofile = cProfile.Profile() if 'cprofile' in self.modes else None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._main_thread = threading.main_thread().ident
+        self._previous_trace = None
+
+    # ------------------------------------------------------------ install
+
+    def install(self, namespace, sources=None):
+        """Replace every target in namespace by its profiling wrapper.
+
+        sources maps code filenames ('<cell 12: extract>') to their text, for
+        the per-line listing.
+        """
+        missing = [n for n in self.targets if not callable(namespace.get(n))]
+        if missing:
+            raise ValueError(f"Cannot profile {missing}: no such function after the prelude cells")
+        self.sources.update(sources or {})
+        for name in self.targets:
+            fn = namespace[name]
+            self._codes[fn.__code__] = name
+            self.calls[name] = {'calls': 0, 'total_s': 0.0, 'max_s': 0.0}
+            namespace[name] = self._wrap(name, fn)
+        if 'samples' in self.modes:
+            self._sampler = threading.Thread(target=self._sample, name='tep-profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def _wrap(self, name, fn):
+        stats = self.calls[name]
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                stats['calls'] += 1
+                gen = fn(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        t0 = self._enter()
+                        try:
+                            item = next(gen)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += self._exit(t0)
+                        yield item
+                finally:
+                    stats['total_s'] += elapsed
+                    stats['max_s'] = max(stats['max_s'], elapsed)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                stats['calls'] += 1
+                t0 = self._enter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    elapsed = self._exit(t0)
+                    stats['total_s'] += elapsed
+                    stats['max_s'] = max(stats['max_s'], elapsed)
+        wrapper.__profiled__ = fn
+        return wrapper
+
+    def _enter(self):
+        self._depth += 1
+        if self._depth == 1:
+            if self._cprofile is not None:
+                self._cprofile.enable()
+            if 'lines' in self.modes:
+                self._previous_trace = sys.gettrace()
+                sys.settrace(self._trace_calls)
+        return time.perf_counter()
+
+    def _exit(self, t0):
+        elapsed = time.perf_counter() - t0
+        self._depth -= 1
+        if self._depth == 0:
+            if 'lines' in self.modes:
+                sys.settrace(self._previous_trace)
+            if self._cprofile is not None:
+                self._cprofile.disable()
+        return elapsed
+
+    # ------------------------------------------------------------ collectors
+
+    def _trace_calls(self, frame, event, arg):
+        if event == 'call' and frame.f_code in self._codes:
+            self._line_state[frame] = None
+            return self._trace_lines
+        return None
+
+    def _trace_lines(self, frame, event, arg):
+        now = time.perf_counter()
+        last = self._line_state.get(frame)
+        if last is not None:
+            entry = self.lines.setdefault((self._codes[frame.f_code], last[0]), [0, 0.0])
+            entry[0] += 1
+            entry[1] += now - last[1]
+        if event == 'return':
+            self._line_state.pop(frame, None)
+        else:
+            self._line_state[frame] = (frame.f_lineno, now)
+        return self._trace_lines
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            if self._depth == 0:
+                continue
+            frame = sys._current_frames().get(self._main_thread)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != __file__:
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})".replace(';', ':'))
+                frame = frame.f_back
+            if names:
+                key = ';'.join(reversed(names))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    # ------------------------------------------------------------ output
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def summary_table(self):
+        lines = [f"{'function':<30} {'calls':>9} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+        for name, s in sorted(self.calls.items(), key=lambda kv: -kv[1]['total_s']):
+            mean = s['total_s'] / s['calls'] * 1000 if s['calls'] else 0.0
+            lines.append(f"{name:<30} {s['calls']:>9,} {s['total_s']:>9.3f} {mean:>9.3f} {s['max_s'] * 1000:>9.2f}")
+        return '\n'.join(lines)
+
+    def _line_listing(self):
+        out = []
+        for code, name in self._codes.items():
+            source = self.sources.get(code.co_filename, '').splitlines()
+            rows = sorted((line, hits, secs) for (n, line), (hits, secs) in self.lines.items() if n == name)
+            total = sum(secs for _, _, secs in rows) or 1.0
+            out.append(f"\n{name}  ({code.co_filename}, line {code.co_firstlineno})")
+            out.append(f"{'line':>6} {'hits':>10} {'time s':>9} {'%':>6}  source")
+            for line, hits, secs in rows:
+                text = source[line - 1].rstrip() if 0 < line <= len(source) else ''
+                out.append(f"{line:>6} {hits:>10,} {secs:>9.4f} {secs / total * 100:>5.1f}%  {text}")
+        return '\n'.join(out)
+
+    def write(self, output_dir):
+        """Write the collected profiles under output_dir; returns the written paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+
+        def dump(name, text):
+            path = os.path.join(output_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            paths.append(path)
+
+        data = {'targets': list(self.targets), 'modes': list(self.modes), 'functions': self.calls}
+        if 'lines' in self.modes:
+            data['lines'] = {name: {str(line): {'hits': hits, 'seconds': secs}
+                                    for (n, line), (hits, secs) in sorted(self.lines.items()) if n == name}
+                             for name in self.targets}
+        dump('functions.json', json.dumps(data, indent=2))
+        text = self.summary_table()
+        if 'lines' in self.modes:
+            text += '\n' + self._line_listing()
+        dump('functions.txt', text + '\n')
+        if self._cprofile is not None and any(s['calls'] for s in self.calls.values()):
+            path = os.path.join(output_dir, 'cprofile.pstats')
+            self._cprofile.dump_stats(path)
+            paths.append(path)
+            listing = io.StringIO()
+            pstats.Stats(self._cprofile, stream=listing).sort_stats('cumulative').print_stats(60)
+            dump('cprofile.txt', listing.getvalue())
+        if 'samples' in self.modes:
+            dump('stacks.folded', ''.join(f'{stack} {n}\n' for stack, n in sorted(self.stacks.items())))
+        return paths
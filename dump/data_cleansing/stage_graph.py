@@ -0,0 +1,272 @@
+"""Stage DAG over the notebook cells, with fingerprint memoization.
+
+build_notebook.py names every cell that computes data and declares the names
+it reads (inputs), the names it sets (outputs) and the OUTPUT_DIR files it
+writes (glob patterns), e.g. tb_t_monthly_pob reads only df_pob_combined.
+Unnamed cells (parameters, imports, function definitions) are prelude and
+always execute, whichever stages are selected.
+
+A stage's fingerprint hashes its own source, the setup cell and the prelude
+cells defining the names it uses (directly or through other prelude cells),
+plus the content hash of every input: the recorded hash
+of the upstream stage output, or for names set by the parameters/setup cells
+the value itself (a path to an existing file stands for the file's content).
+Output hashes are content hashes too, so a stage that reruns but reproduces
+the same outputs does not dirty its dependents.
+
+Memo entries live in <output_dir>/.stage_cache: <stage>.json records the
+fingerprint, input/output hashes and the output files the stage wrote;
+<stage>.pkl holds the pickled outputs.
+"""
+import ast
+import glob
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass
+
+MEMO_DIRNAME = '.stage_cache'
+
+
+@dataclass
+class Stage:
+    index: int
+    group: str
+    source: str
+    name: str = None        # None for prelude cells
+    inputs: tuple = ()
+    outputs: tuple = ()
+    files: tuple = ()
+    barrier: bool = False
+    code_hash: str = ''
+
+
+def build_graph(cells):
+    """Stages for the notebook's code cells, in notebook order."""
+    graph = []
+    for cell in cells:
+        if cell['cell_type'] != 'code':
+            continue
+        decl = cell['metadata'].get('pipeline', {})
+        graph.append(Stage(index=len(graph), group=cell['metadata']['tags'][0],
+                           source='\n'.join(cell['source']), name=decl.get('name'),
+                           inputs=tuple(decl.get('inputs', ())), outputs=tuple(decl.get('outputs', ())),
+                           files=tuple(decl.get('files', ())), barrier=decl.get('barrier', False)))
+
+    prelude = [(cell, *_names(cell.source)) for cell in graph
+               if cell.name is None and cell.group != 'parameters']
+    seen = set()
+    for stage in graph:
+        if stage.name is None:
+            continue
+        if stage.name in seen:
+            raise ValueError(f"Duplicate stage name {stage.name!r}")
+        seen.add(stage.name)
+        # The stage's code is its own source plus the setup cell and every
+        # prelude cell defining a name it uses, directly or via other prelude.
+        used = _names(stage.source)[1]
+        deps = {cell.index for cell, _, _ in prelude if cell.group == 'setup'}
+        grew = True
+        while grew:
+            grew = False
+            for cell, defined, refs in prelude:
+                if cell.index not in deps and defined & used:
+                    deps.add(cell.index)
+                    used |= refs
+                    grew = True
+        h = hashlib.sha256(stage.source.encode())
+        for index in sorted(deps):
+            h.update(graph[index].source.encode())
+        stage.code_hash = h.hexdigest()
+    return graph
+
+
+def _names(source):
+    """(names bound at the top level of source, all names it reads)."""
+    tree = ast.parse(source)
+    defined = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            defined.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            defined.update((a.asname or a.name).split('.')[0] for a in node.names)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            for target in getattr(node, 'targets', [getattr(node, 'target', None)]):
+                defined.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+    refs = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+    return defined, refs
+
+
+def producers(graph):
+    """{stage name: {input: name of the stage producing it, or None if external}}."""
+    latest, result = {}, {}
+    for stage in graph:
+        if stage.name is None:
+            continue
+        result[stage.name] = {n: latest.get(n) for n in stage.inputs}
+        latest.update(dict.fromkeys(stage.outputs, stage.name))
+    return result
+
+
+def dependencies(graph, selected=None):
+    """{stage name: names of the earlier stages it must wait for}.
+
+    Besides the producers of its inputs, a stage waits for earlier stages that
+    read or write any name it writes, so values never change under a reader.
+    Only stages whose group is in selected (all when None) are considered.
+    """
+    named = [s for s in graph if s.name is not None and (selected is None or s.group in selected)]
+    deps = {}
+    for i, stage in enumerate(named):
+        deps[stage.name] = {
+            earlier.name for earlier in named[:i]
+            if stage.barrier or earlier.barrier
+            or set(earlier.outputs) & (set(stage.inputs) | set(stage.outputs))
+            or set(earlier.inputs) & set(stage.outputs)
+        }
+    return deps
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _update_hash(h, value):
+    # Parameters and file hashes are plain values: no need to load pandas
+    if isinstance(value, dict):
+        h.update(f'dict {len(value)}'.encode())
+        for k, v in value.items():
+            _update_hash(h, k)
+            _update_hash(h, v)
+        return
+    if isinstance(value, (str, bytes, int, float, tuple, list, type(None))):
+        _update_pickled(h, value)
+        return
+    import numpy as np
+    import pandas as pd
+    # Frames hash column by column rather than as one pickle: the pickled bytes
+    # depend on block layout and object sharing, which differ between a fresh
+    # frame and the same frame loaded back from the memo.
+    if isinstance(value, pd.DataFrame):
+        h.update(b'frame')
+        _update_hash(h, value.columns)
+        _update_hash(h, value.index)
+        for i in range(value.shape[1]):
+            _update_hash(h, value.iloc[:, i].to_numpy())
+    elif isinstance(value, pd.Series):
+        h.update(b'series')
+        _update_hash(h, value.index)
+        _update_hash(h, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        h.update(b'index')
+        _update_hash(h, value.to_numpy())
+    elif isinstance(value, np.ndarray):
+        h.update(f'array {value.dtype} {value.shape}'.encode())
+        if value.dtype == object:
+            for v in value.ravel():
+                _update_hash(h, v)
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    else:
+        _update_pickled(h, value)
+
+
+def _update_pickled(h, value):
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    h.update(len(blob).to_bytes(8, 'little'))
+    h.update(blob)
+
+
+def content_hash(value):
+    h = hashlib.sha256()
+    _update_hash(h, value)
+    return h.hexdigest()
+
+
+def value_hash(value):
+    """Content hash of an external input value."""
+    if isinstance(value, str) and os.path.isfile(value):
+        return 'file:' + file_sha256(value)
+    return content_hash(value)
+
+
+def stage_fingerprint(stage, input_hashes):
+    payload = json.dumps([stage.code_hash, sorted(input_hashes.items())])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class StageMemo:
+    """Outputs of previous stage runs, keyed by stage name and fingerprint."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.dir = os.path.join(output_dir, MEMO_DIRNAME)
+
+    def entry(self, name):
+        path = os.path.join(self.dir, f'{name}.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def check(self, stage, fingerprint, input_hashes):
+        """None if the memoized run is still valid, else why the stage must run."""
+        entry = self.entry(stage.name)
+        if entry is None:
+            return 'not run before'
+        if entry['fingerprint'] == fingerprint:
+            for fname, stat in entry['files'].items():
+                if self._stat(fname) != stat:
+                    return f'output {fname} changed'
+            return None
+        if entry['code_hash'] != stage.code_hash:
+            return 'code changed'
+        changed = [n for n in stage.inputs if entry['inputs'].get(n) != input_hashes.get(n)]
+        return f"input {', '.join(changed)} changed"
+
+    def load_outputs(self, name):
+        with open(os.path.join(self.dir, f'{name}.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, stage, fingerprint, input_hashes, outputs):
+        """Memoize one stage run; returns {output: content hash}."""
+        output_hashes = {n: content_hash(v) for n, v in outputs.items()}
+        entry = {
+            'stage': stage.name, 'fingerprint': fingerprint, 'code_hash': stage.code_hash,
+            'inputs': input_hashes, 'outputs': output_hashes, 'files': self.output_files(stage),
+        }
+        os.makedirs(self.dir, exist_ok=True)
+        # Outputs first: a manifest on disk always points at complete outputs.
+        self._write_atomic(f'{stage.name}.pkl', pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL))
+        self._write_atomic(f'{stage.name}.json', json.dumps(entry, indent=1).encode())
+        return output_hashes
+
+    def output_files(self, stage):
+        """{file name: [size, mtime_ns]} for the OUTPUT_DIR files matching stage.files.
+
+        Patterns may name a subdirectory (api/bp/*); file names are relative
+        to OUTPUT_DIR.
+        """
+        root = glob.escape(self.output_dir)
+        names = sorted({os.path.relpath(path, self.output_dir)
+                        for pattern in stage.files for path in glob.glob(os.path.join(root, pattern))
+                        if os.path.isfile(path)})
+        return {f: self._stat(f) for f in names}
+
+    def _stat(self, fname):
+        try:
+            st = os.stat(os.path.join(self.output_dir, fname))
+        except FileNotFoundError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _write_atomic(self, fname, data):
+        tmp = os.path.join(self.dir, f'{fname}.tmp{os.getpid()}')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(self.dir, fname))
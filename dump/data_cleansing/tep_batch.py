@@ -0,0 +1,200 @@
+"""Multi-project batch mode for the TEP data pipeline.
+
+A packs directory holds one subdirectory per project, each with its own
+Timeline / Contract Evolution / Cost Breakdown Structure workbooks and an
+optional project.json of tb_m_project fields (project_code, project_name,
+client, ...). Packs get project IDs in name order and run through
+tep_pipeline.run_pipeline in a process pool, one pack per task. The 13
+tables and the rollups of the packs that succeed are merged with globally
+unique surrogate keys and written as one set of CSVs plus
+tep_mysql_insert.sql; a pack that fails is reported in batch_report.json
+without stopping the others.
+
+Usage:
+    python tep_batch.py --packs-dir ../packs --output-dir ./batch_out --workers 4
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from tep_pipeline import OPTIONAL_STAGES, export_tables, run_pipeline
+
+# Parameter name -> file name pattern of each workbook in a pack.
+WORKBOOK_PATTERNS = {
+    'TIMELINE_WORKBOOK': 'Contract Value Overview and Timeline*.xlsx',
+    'EVOLUTION_WORKBOOK': '*Contract Evolution*.xlsx',
+    'CBS_WORKBOOK': 'Cost Breakdown Structure*.xlsx',
+}
+
+PROJECT_FIELDS = ('project_code', 'project_name', 'client', 'country', 'contract_type',
+                  'original_contract_value', 'start_date', 'planned_end_date',
+                  'actual_end_date', 'status')
+
+# Table -> (surrogate key, {foreign key column: referenced table}). project_id
+# is already unique across packs, so it is not renumbered.
+TABLE_KEYS = {
+    'tb_m_project': ('project_id', {}),
+    'tb_m_amendment': ('amendment_id', {}),
+    'tb_m_cost_category': ('category_id', {'parent_category_id': 'tb_m_cost_category'}),
+    'tb_m_cost_discipline': ('discipline_id', {}),
+    'tb_m_subcontractor': ('subcontractor_id', {}),
+    'tb_m_event': ('event_id', {}),
+    'tb_t_contract_value': ('id', {'amendment_id': 'tb_m_amendment',
+                                   'cost_category_id': 'tb_m_cost_category'}),
+    'tb_t_monthly_cost': ('id', {}),
+    'tb_t_monthly_pob': ('id', {}),
+    'tb_t_pamf_claim': ('id', {'discipline_id': 'tb_m_cost_discipline'}),
+    'tb_t_variation_order': ('vo_id', {'approved_in_amendment': 'tb_m_amendment'}),
+    'tb_t_subcontractor_monthly': ('id', {'subcontractor_id': 'tb_m_subcontractor'}),
+    'tb_t_project_progress': ('id', {'subcontractor_id': 'tb_m_subcontractor'}),
+    'tb_r_monthly_cost_wide': ('id', {}),
+    'tb_r_pamf_group_total': ('id', {}),
+    'tb_r_amendment_growth': ('id', {'amendment_id': 'tb_m_amendment'}),
+    'tb_r_subcontractor_progress_latest': ('id', {'subcontractor_id': 'tb_m_subcontractor'}),
+}
+
+
+def discover_packs(packs_dir, first_project_id=1):
+    """One dict per subdirectory holding .xlsx files, in name order.
+
+    Every pack gets a project_id; packs with a missing or ambiguous workbook
+    or a bad project.json carry an 'error' instead of failing discovery.
+    """
+    packs = []
+    for name in sorted(os.listdir(packs_dir)):
+        pack_dir = os.path.join(packs_dir, name)
+        if not os.path.isdir(pack_dir):
+            continue
+        files = os.listdir(pack_dir)
+        if not any(f.lower().endswith('.xlsx') for f in files):
+            continue
+        pack = {'name': name, 'dir': pack_dir, 'project_id': first_project_id + len(packs),
+                'params': {}, 'error': None}
+        packs.append(pack)
+        for param, pattern in WORKBOOK_PATTERNS.items():
+            matches = [f for f in files if fnmatch.fnmatch(f, pattern) and not f.startswith('~$')]
+            if len(matches) != 1:
+                pack['error'] = f"expected one workbook matching {pattern!r}, found {matches or 'none'}"
+                break
+            pack['params'][param] = matches[0]
+        info_path = os.path.join(pack_dir, 'project.json')
+        if pack['error'] is None and os.path.exists(info_path):
+            try:
+                with open(info_path, encoding='utf-8') as f:
+                    info = json.load(f)
+                unknown = set(info) - set(PROJECT_FIELDS)
+                if unknown:
+                    raise ValueError(f"unknown tb_m_project fields {sorted(unknown)}")
+                pack['params']['PROJECT_INFO'] = info
+            except ValueError as e:
+                pack['error'] = f"project.json: {e}"
+    return packs
+
+
+def run_pack(pack, output_dir, stages, memo):
+    """Run one pack; returns its report entry and all_tables (None on failure)."""
+    t0 = time.perf_counter()
+    report = {'pack': pack['name'], 'project_id': pack['project_id'], 'output_dir': output_dir}
+    try:
+        if pack['error']:
+            raise ValueError(pack['error'])
+        params = dict(pack['params'], PROJECT_ID=pack['project_id'])
+        if not memo:
+            params['USE_EXTRACTION_CACHE'] = False
+        ns = run_pipeline(pack['dir'], output_dir, stages=stages, params=params, memo=memo)
+        all_tables = ns['all_tables']
+        report.update(status='ok', rows={t: len(df) for t, df in all_tables.items()})
+    except Exception as e:
+        all_tables = None
+        report.update(status='failed', error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    report['seconds'] = round(time.perf_counter() - t0, 2)
+    return report, all_tables
+
+
+def merge_project_tables(project_tables):
+    """Concatenate per-project all_tables (in the given order), renumbering
+    every surrogate key so it is unique across projects."""
+    offsets = dict.fromkeys(TABLE_KEYS, 0)
+    merged = {t: [] for t in TABLE_KEYS}
+    for all_tables in project_tables:
+        pack_offsets = dict(offsets)
+        for table, (key, _) in TABLE_KEYS.items():
+            df = all_tables.get(table)
+            if df is None or len(df) == 0 or key == 'project_id':
+                continue
+            offsets[table] += int(df[key].max())
+        for table, (key, refs) in TABLE_KEYS.items():
+            df = all_tables.get(table)
+            if df is None or len(df) == 0:
+                continue
+            df = df.copy()
+            if key != 'project_id':
+                df[key] = df[key] + pack_offsets[table]
+            for col, ref in refs.items():
+                if col in df.columns:
+                    df[col] = df[col] + pack_offsets[ref]
+            merged[table].append(df)
+    return {t: pd.concat(frames, ignore_index=True) for t, frames in merged.items() if frames}
+
+
+def run_batch(packs_dir, output_dir, workers=1, stages=('raw_csv', 'csv'), memo=True, first_project_id=1):
+    """Process every pack, merge the successful ones into output_dir and write
+    batch_report.json there. Returns the report."""
+    packs = discover_packs(packs_dir, first_project_id)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(pack, os.path.join(output_dir, 'packs', pack['name']), tuple(stages), memo) for pack in packs]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            results = list(pool.map(run_pack, *zip(*jobs)))
+    else:
+        results = [run_pack(*job) for job in jobs]
+
+    ok = [(report, tables) for report, tables in results if tables is not None]
+    merged = merge_project_tables([tables for _, tables in ok])
+    if merged:
+        export_tables(merged, output_dir)
+    report = {
+        'packs_dir': os.path.abspath(packs_dir),
+        'projects': [r for r, _ in results],
+        'merged_rows': {t: len(df) for t, df in merged.items()},
+    }
+    with open(os.path.join(output_dir, 'batch_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-p', '--packs-dir', required=True, help='directory with one subdirectory per project pack')
+    parser.add_argument('-o', '--output-dir', required=True,
+                        help='directory for the merged CSVs/SQL; per-pack outputs go to packs/<name>')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='packs processed in parallel (0: one per CPU)')
+    parser.add_argument('--stages', default='raw_csv,csv',
+                        help=f"comma-separated optional stages run per pack (from {','.join(OPTIONAL_STAGES)})")
+    parser.add_argument('--first-project-id', type=int, default=1, help='project_id of the first pack')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the extraction cache and stage memo')
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    report = run_batch(args.packs_dir, args.output_dir, workers=args.workers or os.cpu_count(),
+                       stages=stages, memo=not args.no_cache, first_project_id=args.first_project_id)
+    failed = [p for p in report['projects'] if p['status'] != 'ok']
+    for p in report['projects']:
+        detail = '' if p['status'] == 'ok' else f"  {p['error']}"
+        print(f"  [{p['project_id']:>3}] {p['pack']:<30} {p['status']:<7} {p['seconds']:7.2f} s{detail}",
+              file=sys.stderr)
+    print(f"Batch complete in {time.perf_counter() - t0:.2f} s: {len(report['projects']) - len(failed)} ok, "
+          f"{len(failed)} failed -> {os.path.abspath(args.output_dir)}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import { promises as fs } from 'fs'
+import path from 'path'
+import { gunzipSync } from 'zlib'
+import { prisma } from '@/lib/prisma'
+
+// Precomputed /api/bp responses written by the data pipeline's api stage
+// (dump/data_cleansing, notebook section 6.4). Set BP_STATIC_PAYLOAD_DIR to its
+// <output-dir>/api/bp directory to serve them instead of querying MySQL. They are
+// used only while the database holds the data they were rendered from: the
+// manifest's run_id must equal the one the pipeline wrote to tb_pipeline_run.
+type ManifestEntry = { file: string; etag: string; bytes: number }
+type Manifest = { run_id: string; payloads: Record<string, ManifestEntry> }
+
+// How long a tb_pipeline_run lookup is trusted before querying it again
+const RUN_CHECK_TTL_MS = 30 * 1000
+
+let manifestCache: { file: string; mtimeMs: number; manifest: Manifest } | null = null
+let runCache: { runId: string | null; checkedAt: number } | null = null
+let warnedMismatch: string | null = null
+
+async function loadManifest(dir: string) {
+  const file = path.join(dir, 'manifest.json')
+  const { mtimeMs } = await fs.stat(file)
+  // Re-read only when the pipeline has rewritten the payloads
+  if (!manifestCache || manifestCache.file !== file || manifestCache.mtimeMs !== mtimeMs) {
+    manifestCache = { file, mtimeMs, manifest: JSON.parse(await fs.readFile(file, 'utf8')) }
+  }
+  return manifestCache.manifest
+}
+
+/** The run id of the data in the database; null while a load is in progress or before the first one. */
+async function databaseRunId() {
+  const now = Date.now()
+  if (!runCache || now - runCache.checkedAt > RUN_CHECK_TTL_MS) {
+    let runId: string | null = null
+    try {
+      const run = await prisma.tbPipelineRun.findFirst({ select: { runId: true } })
+      runId = run?.runId ?? null
+    } catch (error) {
+      // Databases loaded before the pipeline wrote tb_pipeline_run have no such table
+      console.error('Static payload run check error:', error)
+    }
+    runCache = { runId, checkedAt: now }
+  }
+  return runCache.runId
+}
+
+/**
+ * Whether the client takes gzip: the q-value of its `gzip` (or `x-gzip`)
+ * coding, else of `*`, must be above 0. No header means identity only.
+ */
+function acceptsGzip(header: string | null) {
+  if (!header) return false
+  let gzip: number | undefined
+  let wildcard: number | undefined
+  for (const part of header.split(',')) {
+    const [coding, ...params] = part.split(';').map((token) => token.trim().toLowerCase())
+    const q = params.find((param) => param.startsWith('q='))
+    const weight = q === undefined ? 1 : Number(q.slice(2))
+    if (coding === 'gzip' || coding === 'x-gzip') gzip = weight
+    else if (coding === '*') wildcard = weight
+  }
+  // A malformed q-value parses to NaN and counts as a refusal
+  return (gzip ?? wildcard ?? 0) > 0
+}
+
+/** Whether If-None-Match (`*` or a list of possibly weak tags) matches the ETag. */
+function etagMatches(header: string | null, etag: string) {
+  if (!header) return false
+  const opaque = (tag: string) => tag.trim().replace(/^W\//, '')
+  return header.split(',').some((tag) => tag.trim() === '*' || opaque(tag) === opaque(etag))
+}
+
+/**
+ * The precomputed response for this request, or null when there is none
+ * (feature off, filters other than `year`, payload missing, database loaded
+ * from other data) and the route should query the database as usual.
+ */
+export async function staticPayload(request: Request): Promise<Response | null> {
+  const dir = process.env.BP_STATIC_PAYLOAD_DIR
+  if (!dir) return null
+
+  const { pathname, searchParams } = new URL(request.url)
+  const params = Array.from(searchParams.keys())
+  let key = pathname
+  if (params.length === 1 && params[0] === 'year') {
+    key += `?year=${searchParams.get('year')}`
+  } else if (params.length > 0) {
+    return null
+  }
+
+  try {
+    const manifest = await loadManifest(dir)
+    const entry = manifest.payloads?.[key]
+    if (!entry) return null
+
+    const runId = await databaseRunId()
+    if (runId !== manifest.run_id) {
+      const mismatch = `${manifest.run_id}/${runId}`
+      if (warnedMismatch !== mismatch) {
+        warnedMismatch = mismatch
+        console.warn(
+          `Static payloads in ${dir} are from run ${manifest.run_id}, the database from ` +
+            `${runId ?? 'no recorded run'}; querying the database until the two match`
+        )
+      }
+      return null
+    }
+
+    const headers = {
+      'Content-Type': 'application/json',
+      ETag: entry.etag,
+      'Cache-Control': 'no-cache',
+      Vary: 'Accept-Encoding',
+    }
+    if (etagMatches(request.headers.get('if-none-match'), entry.etag)) {
+      return new Response(null, { status: 304, headers })
+    }
+
+    const body = await fs.readFile(path.join(dir, entry.file))
+    if (acceptsGzip(request.headers.get('accept-encoding'))) {
+      return new Response(body, { headers: { ...headers, 'Content-Encoding': 'gzip' } })
+    }
+    return new Response(gunzipSync(body), { headers })
+  } catch (error) {
+    console.error('Static payload error:', error)
+    return null
+  }
+}